@@ -1,5 +1,6 @@
 use pyo3::prelude::*;
 use pyo3::exceptions::PyValueError;
+use std::collections::HashMap;
 use std::path::Path;
 
 use crate::bridge::action_map::{action_mask, action_to_index, index_to_action, ACTION_SPACE_SIZE};
@@ -21,6 +22,8 @@ pub struct PyGameEngine {
     rng: Option<GameRng>,
     /// Which player the agent controls (0 or 1).
     agent_player: usize,
+    /// Validated decks keyed by card indices, reused by `reset_indices`.
+    deck_templates: HashMap<Vec<usize>, Deck>,
 }
 
 #[pymethods]
@@ -38,6 +41,7 @@ impl PyGameEngine {
             state: None,
             rng: None,
             agent_player: 0,
+            deck_templates: HashMap::new(),
         })
     }
 
@@ -62,6 +66,36 @@ impl PyGameEngine {
         Ok(self.get_observation())
     }
 
+    /// Reset using card database indices (positions in `card_ids()`) instead
+    /// of slugs, skipping the per-card string lookup.
+    /// Returns the initial observation vector.
+    #[pyo3(signature = (deck1_indices, deck2_indices, seed=42, agent_player=0))]
+    fn reset_indices(
+        &mut self,
+        deck1_indices: Vec<usize>,
+        deck2_indices: Vec<usize>,
+        seed: u64,
+        agent_player: usize,
+    ) -> PyResult<Vec<f32>> {
+        let deck1 = self.deck_for_indices(&deck1_indices)?;
+        let deck2 = self.deck_for_indices(&deck2_indices)?;
+
+        let (state, rng) = new_game(deck1, deck2, seed);
+        self.state = Some(state);
+        self.rng = Some(rng);
+        self.agent_player = agent_player;
+
+        Ok(self.get_observation())
+    }
+
+    /// Build and validate a deck once so `reset_indices` calls with the same
+    /// indices clone it instead of rebuilding it.
+    fn add_deck_template(&mut self, indices: Vec<usize>) -> PyResult<()> {
+        let deck = self.build_deck_from_indices(&indices)?;
+        self.deck_templates.insert(indices, deck);
+        Ok(())
+    }
+
     /// Take an action (by index) and return (obs, reward, done, truncated, info_dict).
     fn step(&mut self, action_idx: usize) -> PyResult<(Vec<f32>, f32, bool, bool, String)> {
         let action = index_to_action(action_idx)
@@ -170,6 +204,14 @@ impl PyGameEngine {
             .map(|s| encode_observation(s, player))
     }
 
+    /// Get (observation, action mask) for the player to move in one call,
+    /// for self-play loops that query both every ply.
+    fn decision_state(&self) -> PyResult<(Vec<f32>, Vec<bool>)> {
+        let state = self.state.as_ref()
+            .ok_or_else(|| PyValueError::new_err("Game not initialized"))?;
+        Ok((encode_observation(state, state.current_player), action_mask(state)))
+    }
+
     /// Get number of cards in the database.
     fn num_cards(&self) -> usize {
         self.db.cards.len()
@@ -211,6 +253,23 @@ impl PyGameEngine {
         Deck::new(cards).map_err(|e| PyValueError::new_err(e.to_string()))
     }
 
+    fn build_deck_from_indices(&self, indices: &[usize]) -> PyResult<Deck> {
+        let mut cards = Vec::with_capacity(indices.len());
+        for &i in indices {
+            let card = self.db.cards.get(i)
+                .ok_or_else(|| PyValueError::new_err(format!("Card index out of range: {}", i)))?;
+            cards.push(card.clone());
+        }
+        Deck::new(cards).map_err(|e| PyValueError::new_err(e.to_string()))
+    }
+
+    fn deck_for_indices(&self, indices: &[usize]) -> PyResult<Deck> {
+        match self.deck_templates.get(indices) {
+            Some(deck) => Ok(deck.clone()),
+            None => self.build_deck_from_indices(indices),
+        }
+    }
+
     fn get_observation(&self) -> Vec<f32> {
         match &self.state {
             Some(state) => encode_observation(state, self.agent_player),
@@ -64,6 +64,17 @@ class PokemonTCGPocketEnv(gym.Env):
         info = {"action_mask": np.array(self.action_masks(), dtype=np.bool_)}
         return obs, info
 
+    def set_decks(self, deck1_ids: list[str], deck2_ids: list[str], agent_player: int | None = None):
+        """Switch to a new matchup; takes effect at the next ``reset``.
+
+        Lets a vectorized env change decks through ``env_method`` instead
+        of being rebuilt.
+        """
+        self.deck1_ids = deck1_ids
+        self.deck2_ids = deck2_ids
+        if agent_player is not None:
+            self.agent_player = agent_player
+
     def step(self, action):
         reward, done = self._safe_step(int(action))
 
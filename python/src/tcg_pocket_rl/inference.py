@@ -0,0 +1,65 @@
+"""Batched deterministic inference for a trained MaskablePPO policy."""
+
+import contextlib
+
+import numpy as np
+import torch
+
+
+class BatchPolicy:
+    """Deterministic masked action selection over preallocated buffers.
+
+    ``obs`` and ``masks`` are numpy views aliasing torch tensors (pinned
+    when the policy lives on CUDA). Fill their first ``n`` rows, then call
+    ``act(n)``; this skips the numpy->tensor copies done by
+    ``model.predict``, and takes the argmax of the masked actor logits
+    directly instead of building a masked distribution.
+
+    On CUDA the forward pass runs under fp16 autocast unless
+    ``fp16=False``. With ``quantize=True`` (CPU only) the Linear layers are
+    replaced by dynamically quantized qint8 versions; the FP32 policy is
+    kept for ``agreement``.
+    """
+
+    def __init__(self, model, max_batch: int, quantize: bool = False, fp16: bool = True):
+        self.fp32_policy = model.policy
+        self.fp32_policy.set_training_mode(False)
+        self.device = self.fp32_policy.device
+        self.policy = self.fp32_policy
+        self.fp16 = fp16 and self.device.type == "cuda"
+        if self.device.type == "cuda":
+            torch.backends.cudnn.benchmark = True
+
+        if quantize:
+            if self.device.type != "cpu":
+                raise ValueError("Dynamic quantization is only supported on CPU")
+            self.policy = torch.quantization.quantize_dynamic(
+                self.fp32_policy, {torch.nn.Linear}, dtype=torch.qint8,
+            )
+
+        pin = self.device.type == "cuda"
+        obs_dim = model.observation_space.shape[0]
+        n_actions = model.action_space.n
+        self._obs_t = torch.empty((max_batch, obs_dim), dtype=torch.float32, pin_memory=pin)
+        self._mask_t = torch.empty((max_batch, n_actions), dtype=torch.bool, pin_memory=pin)
+        self.obs = self._obs_t.numpy()
+        self.masks = self._mask_t.numpy()
+
+    def act(self, n: int) -> np.ndarray:
+        """Return actions for the first ``n`` rows of ``obs``/``masks``."""
+        return self._act(self.policy, n)
+
+    def agreement(self, n: int) -> float:
+        """Fraction of the first ``n`` rows where ``act`` matches the FP32 policy."""
+        return float((self._act(self.policy, n) == self._act(self.fp32_policy, n)).mean())
+
+    def _act(self, policy, n):
+        obs = self._obs_t[:n].to(self.device, non_blocking=True)
+        masks = self._mask_t[:n].to(self.device, non_blocking=True)
+        autocast = (torch.autocast(device_type="cuda", dtype=torch.float16)
+                    if self.fp16 else contextlib.nullcontext())
+        with torch.inference_mode(), autocast:
+            features = policy.extract_features(obs, policy.pi_features_extractor)
+            logits = policy.action_net(policy.mlp_extractor.forward_actor(features))
+            actions = logits.masked_fill(~masks, float("-inf")).argmax(dim=-1)
+        return actions.cpu().numpy()
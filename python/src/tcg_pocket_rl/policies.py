@@ -0,0 +1,52 @@
+"""Policy variants for MaskablePPO training."""
+
+import torch
+from sb3_contrib.common.maskable.policies import MaskableActorCriticPolicy
+
+
+class BF16MaskablePolicy(MaskableActorCriticPolicy):
+    """MaskableActorCriticPolicy with a bfloat16 MLP extractor.
+
+    The shared MLP, which is where the ``net_arch`` GEMMs are, runs under
+    bf16 autocast in ``forward`` (rollouts), ``evaluate_actions`` (the PPO
+    loss) and ``predict_values``, so the stored and recomputed log-probs
+    come from the same precision and the first-epoch PPO ratio is 1. The
+    action/value heads and the masked distribution run in fp32, as do the
+    weights and optimizer state. Only worthwhile on CPUs with native bf16
+    support (AVX512-BF16 / AMX) or on CUDA.
+    """
+
+    def _latents(self, features):
+        with torch.autocast(device_type=self.device.type, dtype=torch.bfloat16):
+            if self.share_features_extractor:
+                latent_pi, latent_vf = self.mlp_extractor(features)
+            else:
+                pi_features, vf_features = features
+                latent_pi = self.mlp_extractor.forward_actor(pi_features)
+                latent_vf = self.mlp_extractor.forward_critic(vf_features)
+        return latent_pi.float(), latent_vf.float()
+
+    def forward(self, obs, deterministic=False, action_masks=None):
+        latent_pi, latent_vf = self._latents(self.extract_features(obs))
+        values = self.value_net(latent_vf)
+        distribution = self._get_action_dist_from_latent(latent_pi)
+        if action_masks is not None:
+            distribution.apply_masking(action_masks)
+        actions = distribution.get_actions(deterministic=deterministic)
+        log_prob = distribution.log_prob(actions)
+        return actions, values, log_prob
+
+    def evaluate_actions(self, obs, actions, action_masks=None):
+        latent_pi, latent_vf = self._latents(self.extract_features(obs))
+        distribution = self._get_action_dist_from_latent(latent_pi)
+        if action_masks is not None:
+            distribution.apply_masking(action_masks)
+        log_prob = distribution.log_prob(actions)
+        values = self.value_net(latent_vf)
+        return values, log_prob, distribution.entropy()
+
+    def predict_values(self, obs):
+        features = super(MaskableActorCriticPolicy, self).extract_features(obs, self.vf_features_extractor)
+        with torch.autocast(device_type=self.device.type, dtype=torch.bfloat16):
+            latent_vf = self.mlp_extractor.forward_critic(features)
+        return self.value_net(latent_vf.float())
@@ -7,14 +7,34 @@ Key constraint: all Pokemon must be usable with a single Energy Zone type.
 """
 
 import json
-import random
+import multiprocessing
 import sys
 import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
+from typing import NamedTuple
 
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional: without it the kernels run as plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+try:
+    from train_meta import resolve_decks, META_DECKS_BY_NAME
+except ImportError:
+    sys.path.insert(0, str(Path(__file__).parent))
+    from train_meta import resolve_decks, META_DECKS_BY_NAME
+
 
 ENERGY_TYPES = ["water", "fire", "grass", "lightning", "psychic",
                 "fighting", "darkness", "metal"]
@@ -22,15 +42,35 @@ ENERGY_TYPES = ["water", "fire", "grass", "lightning", "psychic",
 
 @dataclass
 class DeckCandidate:
-    card_ids: list[str]
+    card_ids: np.ndarray  # int32 card ids, see build_card_index
     energy_type: str = ""
     fitness: float = 0.0
     matchup_wins: dict = None
     games_played: int = 0
+    # Order-insensitive deck identity; card_ids must not change afterwards
+    fingerprint: tuple = None
 
     def __post_init__(self):
         if self.matchup_wins is None:
             self.matchup_wins = {}
+        if self.fingerprint is None:
+            self.fingerprint = tuple(np.sort(self.card_ids).tolist())
+
+
+@lru_cache(maxsize=None)
+def _load_meta(cards_json):
+    """Resolve the meta decks once per process.
+
+    Returns:
+        meta_names: tuple of deck names
+        meta_deck_lists: tuple of 20-slug tuples
+        meta_energy: dict deck name -> energy type
+    """
+    meta_decks_dict = resolve_decks(cards_json)
+    meta_names = tuple(meta_decks_dict.keys())
+    meta_deck_lists = tuple(tuple(deck) for deck in meta_decks_dict.values())
+    meta_energy = {name: info["energy"] for name, info in META_DECKS_BY_NAME.items()}
+    return meta_names, meta_deck_lists, meta_energy
 
 
 # ---------------------------------------------------------------------------
@@ -114,201 +154,377 @@ def build_card_pool(cards, energy_type):
 
 
 # ---------------------------------------------------------------------------
-# Deck building
+# Random helpers (numpy Generator)
 # ---------------------------------------------------------------------------
 
-def build_random_evo_deck(basics, evo_chains, trainers, slug_to_card, rng):
-    """Build a random 20-card deck with evolution lines."""
-    deck = []
-    name_counts = {}
+def rng_choice(seq, rng):
+    """Pick one element of a Python sequence without numpy object conversion."""
+    return seq[int(rng.integers(len(seq)))]
 
-    def add_card(slug):
-        card = slug_to_card.get(slug)
-        if not card:
-            return False
-        name = card["name"]
-        if name_counts.get(name, 0) < 2:
-            deck.append(slug)
-            name_counts[name] = name_counts.get(name, 0) + 1
-            return True
-        return False
 
-    n_pokemon_slots = rng.randint(10, 14)
+def rng_seed(rng):
+    """Draw a seed for a jitted operator's own random stream."""
+    return int(rng.integers(2**31))
 
-    evo_basics = [b for b in basics if b["slug"] in evo_chains]
-    standalone = [b for b in basics if b["slug"] not in evo_chains]
-    rng.shuffle(evo_basics)
-    rng.shuffle(standalone)
 
-    # Add 2-4 evolution lines (2 copies each)
-    n_evo_lines = rng.randint(2, min(4, max(1, len(evo_basics))))
-    for basic in evo_basics[:n_evo_lines]:
-        if len(deck) >= n_pokemon_slots:
-            break
-        chains = evo_chains[basic["slug"]]
-        chain = rng.choice(chains)
-        for slug in chain:
-            if len(deck) < n_pokemon_slots:
-                add_card(slug)
-                add_card(slug)
-
-    # Fill remaining pokemon with standalone basics
-    attempts = 0
-    while len(deck) < n_pokemon_slots and attempts < 100:
-        pool = standalone if standalone else basics
-        add_card(rng.choice(pool)["slug"])
-        attempts += 1
-
-    # Fill rest with trainers
-    attempts = 0
-    while len(deck) < 20 and attempts < 200:
-        add_card(rng.choice(trainers)["slug"])
-        attempts += 1
+# ---------------------------------------------------------------------------
+# Integer card ids
+#
+# The GA works on np.int32 arrays of card ids (positions in cards.json) so
+# the variation operators can run as compiled numba kernels. Decks are
+# converted back to slugs only when handed to the evaluator or printed.
+# ---------------------------------------------------------------------------
+
+class PoolArrays(NamedTuple):
+    """Flattened card pool for one energy type.
+
+    ``group_basic[g]`` is the basic of the g-th evolution family; its chains
+    are ``group_off[g]:group_off[g + 1]``, and chain ``c`` has members
+    ``chain_flat[chain_off[c]:chain_off[c + 1]]``.
+    """
+    basic_ids: np.ndarray
+    standalone_ids: np.ndarray
+    group_basic: np.ndarray
+    group_off: np.ndarray
+    chain_off: np.ndarray
+    chain_flat: np.ndarray
+    trainer_ids: np.ndarray
 
-    # Pad if still short
-    while len(deck) < 20:
-        deck.append(rng.choice(basics)["slug"])
 
-    return deck[:20]
+def build_card_index(cards):
+    """Assign integer ids to cards and their names.
+
+    Returns:
+        slugs: card id -> slug
+        slug_to_id: slug -> card id
+        name_of: np.int32 array, card id -> name id
+        n_names: number of distinct names (size for a name-count array)
+    """
+    slugs = [c["slug"] for c in cards]
+    slug_to_id = {slug: i for i, slug in enumerate(slugs)}
+    name_to_id = {}
+    name_of = np.array([name_to_id.setdefault(c["name"], len(name_to_id)) for c in cards],
+                       dtype=np.int32)
+    return slugs, slug_to_id, name_of, len(name_to_id)
+
+
+def build_pool_arrays(basics, evo_chains, trainers, slug_to_id):
+    """Flatten the output of ``build_card_pool`` into a PoolArrays."""
+    def ids(seq):
+        return np.array([slug_to_id[s] for s in seq], dtype=np.int32)
+
+    group_basic, group_off, chain_off, chain_flat = [], [0], [0], []
+    for basic_slug, chains in evo_chains.items():
+        group_basic.append(basic_slug)
+        for chain in chains:
+            chain_flat.extend(chain)
+            chain_off.append(len(chain_flat))
+        group_off.append(len(chain_off) - 1)
+
+    return PoolArrays(
+        basic_ids=ids(b["slug"] for b in basics),
+        standalone_ids=ids(b["slug"] for b in basics if b["slug"] not in evo_chains),
+        group_basic=ids(group_basic),
+        group_off=np.array(group_off, dtype=np.int32),
+        chain_off=np.array(chain_off, dtype=np.int32),
+        chain_flat=ids(chain_flat),
+        trainer_ids=ids(t["slug"] for t in trainers),
+    )
 
 
 # ---------------------------------------------------------------------------
-# Mutation / crossover
+# Jitted kernels
+#
+# All kernels share one preallocated ``name_counts`` int8 array (indexed by
+# name id) for the 2-copies-per-name rule. It is all zeros on entry and each
+# kernel zeroes the slots of the deck it returns before returning.
 # ---------------------------------------------------------------------------
 
-def mutate_deck(deck_ids, basics, evo_chains, trainers, slug_to_card, rng, n_mutations=2):
-    """Mutate a deck, respecting energy type and evolution chains."""
-    new_deck = list(deck_ids)
-    name_counts = {}
-    for slug in new_deck:
-        card = slug_to_card.get(slug)
-        if card:
-            name_counts[card["name"]] = name_counts.get(card["name"], 0) + 1
+@njit(cache=True)
+def _try_add(deck, size, card, name_of, name_counts):
+    """Append ``card`` if its name is below the copy limit; return new size."""
+    nid = name_of[card]
+    if name_counts[nid] < 2:
+        deck[size] = card
+        name_counts[nid] += 1
+        return size + 1
+    return size
+
+
+@njit(cache=True)
+def _fill(deck, size, target, pool, name_of, name_counts):
+    # One oversampled draw instead of an attempts-bounded retry loop
+    need = target - size
+    if need <= 0 or pool.shape[0] == 0:
+        return size
+    for i in np.random.randint(0, pool.shape[0], 3 * need):
+        size = _try_add(deck, size, pool[i], name_of, name_counts)
+        if size >= target:
+            break
+    return size
 
-    for _ in range(n_mutations):
-        if not new_deck:
+
+@njit(cache=True)
+def _release(deck, size, name_of, name_counts):
+    for i in range(size):
+        name_counts[name_of[deck[i]]] = 0
+
+
+@njit(cache=True)
+def _build_ids(basic_ids, standalone_ids, group_basic, group_off, chain_off, chain_flat,
+               trainer_ids, name_of, name_counts, seed):
+    np.random.seed(seed)
+    deck = np.empty(20, dtype=np.int32)
+    size = 0
+
+    n_pokemon_slots = np.random.randint(10, 15)
+
+    # Add 2-4 evolution lines (2 copies each)
+    n_groups = group_basic.shape[0]
+    groups = np.random.permutation(n_groups)
+    n_evo_lines = np.random.randint(2, max(2, min(4, n_groups)) + 1)
+    for g in groups[:n_evo_lines]:
+        if size >= n_pokemon_slots:
             break
+        c = np.random.randint(group_off[g], group_off[g + 1])
+        for j in range(chain_off[c], chain_off[c + 1]):
+            if size < n_pokemon_slots:
+                size = _try_add(deck, size, chain_flat[j], name_of, name_counts)
+                size = _try_add(deck, size, chain_flat[j], name_of, name_counts)
+
+    # Fill remaining pokemon with standalone basics, then trainers
+    pool = standalone_ids if standalone_ids.shape[0] > 0 else basic_ids
+    size = _fill(deck, size, n_pokemon_slots, pool, name_of, name_counts)
+    size = _fill(deck, size, 20, trainer_ids, name_of, name_counts)
+
+    _release(deck, size, name_of, name_counts)
+
+    # Pad if still short
+    while size < 20:
+        deck[size] = basic_ids[np.random.randint(0, basic_ids.shape[0])]
+        size += 1
+
+    return deck
+
 
-        idx = rng.randint(0, len(new_deck) - 1)
-        removed = slug_to_card.get(new_deck[idx])
-        if removed:
-            name_counts[removed["name"]] = max(0, name_counts.get(removed["name"], 1) - 1)
+@njit(cache=True)
+def _mutate_ids(deck, basic_ids, group_off, chain_off, chain_flat, trainer_ids,
+                name_of, name_counts, n_mutations, seed):
+    np.random.seed(seed)
+    new_deck = deck.copy()
+    n = new_deck.shape[0]
+    if n == 0:
+        return new_deck
+    for i in range(n):
+        name_counts[name_of[new_deck[i]]] += 1
 
-        r = rng.random()
+    n_groups = group_off.shape[0] - 1
+    for _ in range(n_mutations):
+        idx = np.random.randint(0, n)
+        removed = name_of[new_deck[idx]]
+        if name_counts[removed] > 0:
+            name_counts[removed] -= 1
+
+        r = np.random.random()
         added = False
-        if r < 0.3 and evo_chains:
-            basic_slug = rng.choice(list(evo_chains.keys()))
-            chain = rng.choice(evo_chains[basic_slug])
-            member_slug = rng.choice(chain)
-            card = slug_to_card.get(member_slug)
-            if card and name_counts.get(card["name"], 0) < 2:
-                new_deck[idx] = member_slug
-                name_counts[card["name"]] = name_counts.get(card["name"], 0) + 1
+        if r < 0.3 and n_groups > 0:
+            g = np.random.randint(0, n_groups)
+            c = np.random.randint(group_off[g], group_off[g + 1])
+            member = chain_flat[np.random.randint(chain_off[c], chain_off[c + 1])]
+            if name_counts[name_of[member]] < 2:
+                new_deck[idx] = member
+                name_counts[name_of[member]] += 1
                 added = True
-        elif r < 0.6 and basics:
-            basic = rng.choice(basics)
-            if name_counts.get(basic["name"], 0) < 2:
-                new_deck[idx] = basic["slug"]
-                name_counts[basic["name"]] = name_counts.get(basic["name"], 0) + 1
+        elif r < 0.6 and basic_ids.shape[0] > 0:
+            basic = basic_ids[np.random.randint(0, basic_ids.shape[0])]
+            if name_counts[name_of[basic]] < 2:
+                new_deck[idx] = basic
+                name_counts[name_of[basic]] += 1
                 added = True
 
-        if not added and trainers:
-            trainer = rng.choice(trainers)
-            if name_counts.get(trainer["name"], 0) < 2:
-                new_deck[idx] = trainer["slug"]
-                name_counts[trainer["name"]] = name_counts.get(trainer["name"], 0) + 1
-            elif removed:
-                name_counts[removed["name"]] = name_counts.get(removed["name"], 0) + 1
+        if not added and trainer_ids.shape[0] > 0:
+            trainer = trainer_ids[np.random.randint(0, trainer_ids.shape[0])]
+            if name_counts[name_of[trainer]] < 2:
+                new_deck[idx] = trainer
+                name_counts[name_of[trainer]] += 1
+            else:
+                name_counts[removed] += 1
 
+    _release(new_deck, n, name_of, name_counts)
     return new_deck
 
 
-def crossover_decks(parent1, parent2, slug_to_card, rng):
-    """Uniform crossover preserving name-count limits."""
-    child = []
-    name_counts = {}
-
-    combined = list(zip(parent1, parent2))
-    rng.shuffle(combined)
-
-    for s1, s2 in combined:
-        for slug in ([s1, s2] if rng.random() < 0.5 else [s2, s1]):
-            card = slug_to_card.get(slug)
-            if card and name_counts.get(card["name"], 0) < 2:
-                child.append(slug)
-                name_counts[card["name"]] = name_counts.get(card["name"], 0) + 1
+@njit(cache=True)
+def _crossover_ids(parent1, parent2, name_of, name_counts, seed):
+    np.random.seed(seed)
+    n = min(parent1.shape[0], parent2.shape[0])
+    child = np.empty(parent1.shape[0] + parent2.shape[0], dtype=np.int32)
+    size = 0
+
+    for j in np.random.permutation(n):
+        first, second = parent1[j], parent2[j]
+        if np.random.random() >= 0.5:
+            first, second = second, first
+        new_size = _try_add(child, size, first, name_of, name_counts)
+        if new_size == size:
+            new_size = _try_add(child, size, second, name_of, name_counts)
+        size = new_size
+
+    # Pad from the union of both parents only when the copy limit left gaps
+    if size < 20:
+        all_ids = np.unique(np.concatenate((parent1, parent2)))
+        np.random.shuffle(all_ids)
+        for card in all_ids:
+            if size >= 20:
                 break
+            size = _try_add(child, size, card, name_of, name_counts)
 
-    all_slugs = list(set(parent1 + parent2))
-    rng.shuffle(all_slugs)
-    for slug in all_slugs:
-        if len(child) >= 20:
-            break
-        card = slug_to_card.get(slug)
-        if card and name_counts.get(card["name"], 0) < 2:
-            child.append(slug)
-            name_counts[card["name"]] = name_counts.get(card["name"], 0) + 1
+    _release(child, size, name_of, name_counts)
+    return child[:min(size, 20)].copy()
 
-    return child[:20]
+
+# ---------------------------------------------------------------------------
+# Deck building / mutation / crossover
+# ---------------------------------------------------------------------------
+
+def build_random_evo_deck(pool, name_of, name_counts, rng):
+    """Build a random 20-card deck (card id array) with evolution lines."""
+    return _build_ids(pool.basic_ids, pool.standalone_ids, pool.group_basic, pool.group_off,
+                      pool.chain_off, pool.chain_flat, pool.trainer_ids,
+                      name_of, name_counts, rng_seed(rng))
+
+
+def mutate_deck(deck_ids, pool, name_of, name_counts, rng, n_mutations=2):
+    """Mutate a deck, respecting energy type and evolution chains."""
+    return _mutate_ids(deck_ids, pool.basic_ids, pool.group_off, pool.chain_off,
+                       pool.chain_flat, pool.trainer_ids, name_of, name_counts,
+                       n_mutations, rng_seed(rng))
+
+
+def crossover_decks(parent1, parent2, name_of, name_counts, rng):
+    """Uniform crossover preserving name-count limits."""
+    return _crossover_ids(parent1, parent2, name_of, name_counts, rng_seed(rng))
 
 
 # ---------------------------------------------------------------------------
 # Agent-vs-agent evaluation
 # ---------------------------------------------------------------------------
 
-def evaluate_deck_vs_meta(deck_ids, meta_decks, meta_names, engine, model, n_games=10):
-    """Evaluate a deck against all meta decks (agent-vs-agent)."""
-    total_wins = 0
-    total_games = 0
-    matchup_wins = {}
+def play_games_lockstep(engines, games, policy, max_plies=500):
+    """Play several agent-vs-agent games side by side.
 
-    for meta_name, meta_deck in zip(meta_names, meta_decks):
-        wins = 0
-        for game in range(n_games):
-            if game % 2 == 0:
-                d1, d2 = deck_ids, meta_deck
-                candidate_player = 0
-            else:
-                d1, d2 = meta_deck, deck_ids
-                candidate_player = 1
+    Every live engine is advanced by one ply per iteration, with all of
+    their observations written into the policy's preallocated buffers and
+    evaluated in a single batched call.
 
-            seed = hash((tuple(deck_ids[:3]), meta_name, game)) % (2**31)
+    Args:
+        engines: one PyGameEngine per game (at least ``len(games)``)
+        games: list of (deck1_idx, deck2_idx, seed), decks given as card
+            database indices (see ``deck_to_indices``)
+        policy: BatchPolicy with ``max_batch >= len(games)``
 
+    Returns:
+        list of winners per game: 0/1, -1 for draw/timeout, or None if the
+        game could not be started.
+    """
+    winners = [-1] * len(games)
+    live = []
+    for k, (d1, d2, seed) in enumerate(games):
+        try:
+            engines[k].reset_indices(d1, d2, seed=seed, agent_player=0)
+            live.append(k)
+        except Exception:
+            winners[k] = None
+
+    # Preallocated once per BatchPolicy; rows are overwritten in place
+    obs, masks = policy.obs, policy.masks
+    for _ in range(max_plies):
+        live = [k for k in live if not engines[k].is_done()]
+        if not live:
+            break
+
+        n = len(live)
+        for row, k in enumerate(live):
+            obs[row], masks[row] = engines[k].decision_state()
+        masks[:n, 0] |= ~masks[:n].any(axis=1)
+
+        actions = policy.act(n)
+        # The policy argmaxes over masked logits; replace anything that still
+        # slipped through instead of retrying on engine errors
+        illegal = ~masks[np.arange(n), actions]
+        if illegal.any():
+            actions[illegal] = masks[:n][illegal].argmax(axis=1)
+
+        still_live = []
+        for k, action in zip(live, actions.tolist()):
             try:
-                engine.reset(d1, d2, seed=seed, agent_player=0)
-            except Exception:
+                _, reward, done, _, _ = engines[k].step(action)
+            except ValueError:
+                # Only reachable with no legal action (row forced to 0)
                 continue
 
-            winner = -1
-            for _ in range(500):
-                if engine.is_done():
-                    break
-
-                current = engine.current_player()
-                obs = np.array(engine.observation_for(current), dtype=np.float32)
-                mask = np.array(engine.action_masks(), dtype=np.bool_)
-                if not mask.any():
-                    mask[0] = True
-
-                action, _ = model.predict(obs, action_masks=mask, deterministic=True)
-
-                try:
-                    _, reward, done, _, _ = engine.step(int(action))
-                except ValueError:
-                    legal = engine.legal_action_indices()
-                    if legal:
-                        try:
-                            _, reward, done, _, _ = engine.step(legal[0])
-                        except ValueError:
-                            break
-                    else:
-                        break
-
-                if done:
-                    winner = 0 if reward > 0 else 1
-                    break
-
-            if winner == candidate_player:
+            if done:
+                winners[k] = 0 if reward > 0 else 1
+            else:
+                still_live.append(k)
+        live = still_live
+
+    return winners
+
+
+def deck_to_indices(deck_ids, slug_to_index):
+    """Convert a slug deck to engine card indices for ``reset_indices``."""
+    return tuple(slug_to_index[slug] for slug in deck_ids)
+
+
+def meta_seed(meta_name):
+    """32-bit seed base for games against ``meta_name``.
+
+    crc32 rather than hash(): str hashing is salted per process, and seeds
+    must match across evaluation workers.
+    """
+    return zlib.crc32(meta_name.encode())
+
+
+def evaluate_deck_vs_meta(deck_ids, meta_decks, meta_names, engines, policy,
+                          slug_to_index, n_games=10, game_offset=0, meta_seeds=None):
+    """Evaluate a deck against all meta decks (agent-vs-agent).
+
+    ``meta_decks`` are pre-resolved card index tuples; ``deck_ids`` is
+    resolved once here. All ``n_games * len(meta_decks)`` games are played
+    in lockstep on ``engines`` (one engine per game), so each ply is one
+    batched policy call. Games are numbered from ``game_offset``, so a
+    later call can extend an earlier one without replaying its seeds.
+    ``meta_seeds`` are the precomputed ``meta_seed`` values of ``meta_names``.
+    """
+    deck_idx = deck_to_indices(deck_ids, slug_to_index)
+    if meta_seeds is None:
+        meta_seeds = [meta_seed(name) for name in meta_names]
+    candidate_seed = zlib.crc32("|".join(deck_ids).encode())
+
+    games = []
+    candidate_players = []
+    for base_seed, meta_deck in zip(meta_seeds, meta_decks):
+        for game in range(game_offset, game_offset + n_games):
+            seed = (candidate_seed ^ base_seed ^ game) & 0x7FFFFFFF
+            if game % 2 == 0:
+                games.append((deck_idx, meta_deck, seed))
+                candidate_players.append(0)
+            else:
+                games.append((meta_deck, deck_idx, seed))
+                candidate_players.append(1)
+
+    winners = play_games_lockstep(engines, games, policy)
+
+    total_wins = 0
+    total_games = 0
+    matchup_wins = {}
+    for m, meta_name in enumerate(meta_names):
+        wins = 0
+        for k in range(m * n_games, (m + 1) * n_games):
+            if winners[k] is None:
+                continue
+            if winners[k] == candidate_players[k]:
                 wins += 1
             total_games += 1
 
@@ -319,9 +535,156 @@ def evaluate_deck_vs_meta(deck_ids, meta_decks, meta_names, engine, model, n_gam
     return avg_wr, matchup_wins
 
 
+class EvalWorker:
+    """Engine pool + policy that evaluates candidate decks against the meta.
+
+    Runs in-process for local evaluation, or as a Ray actor (one per
+    worker) for distributed evaluation.
+    """
+
+    def __init__(self, cards_json, model_path, n_games_per_matchup, quantize=False,
+                 device="auto"):
+        import torch
+        from sb3_contrib import MaskablePPO
+        from tcg_pocket_engine import PyGameEngine
+        from tcg_pocket_rl.inference import BatchPolicy
+
+        torch.distributions.Distribution.set_default_validate_args(False)
+
+        self.n_games = n_games_per_matchup
+        self.meta_names, meta_deck_lists, _ = _load_meta(cards_json)
+        self.meta_seeds = [meta_seed(name) for name in self.meta_names]
+
+        # One engine per game so all of a candidate's games run in lockstep
+        n_engines = n_games_per_matchup * len(meta_deck_lists)
+        model = MaskablePPO.load(model_path, device=device)
+        self.policy = BatchPolicy(model, max_batch=n_engines, quantize=quantize)
+        self.engines = [PyGameEngine(cards_json) for _ in range(n_engines)]
+
+        # Resolve decks to engine card indices once instead of per reset
+        self.slug_to_index = {slug: i for i, slug in enumerate(self.engines[0].card_ids())}
+        self.meta_deck_idx = [deck_to_indices(deck, self.slug_to_index)
+                              for deck in meta_deck_lists]
+        # Meta decks are replayed for every candidate: build them once per engine
+        for engine in self.engines:
+            for deck in self.meta_deck_idx:
+                engine.add_deck_template(deck)
+
+        if quantize:
+            self._check_quantized()
+
+    def _check_quantized(self):
+        """Compare qint8 vs FP32 action choices on seeded opening states."""
+        n_meta = len(self.meta_deck_idx)
+        for k, engine in enumerate(self.engines):
+            engine.reset_indices(self.meta_deck_idx[k % n_meta],
+                                 self.meta_deck_idx[(k + 1) % n_meta], seed=k)
+            self.policy.obs[k] = engine.observation_for(engine.current_player())
+            self.policy.masks[k] = engine.action_masks()
+            if not self.policy.masks[k].any():
+                self.policy.masks[k, 0] = True
+        agreement = self.policy.agreement(len(self.engines))
+        print(f"  Quantized policy matches FP32 on {agreement:.0%} of opening actions")
+
+    def evaluate(self, deck_ids, n_games=None, game_offset=0):
+        """Return (fitness, matchup_wins), or None if evaluation failed.
+
+        ``n_games`` per matchup defaults to, and may not exceed, the
+        ``n_games_per_matchup`` the engine pool was sized for.
+        """
+        try:
+            return evaluate_deck_vs_meta(
+                deck_ids, self.meta_deck_idx, self.meta_names,
+                self.engines, self.policy, self.slug_to_index,
+                n_games or self.n_games, game_offset, self.meta_seeds,
+            )
+        except Exception:
+            return None
+
+
+_WORKER = None
+
+
+def _worker_init(cards_json, model_path, n_games_per_matchup, quantize, device):
+    global _WORKER
+    _WORKER = EvalWorker(cards_json, model_path, n_games_per_matchup, quantize, device)
+
+
+def _eval_worker(deck_ids, n_games, game_offset):
+    return _WORKER.evaluate(deck_ids, n_games, game_offset)
+
+
+def make_evaluator(cards_json, model_path, n_games_per_matchup, backend="local", n_workers=1,
+                   quantize=False, device="auto"):
+    """Return a function mapping a list of decks to EvalWorker.evaluate results.
+
+    The function is called as ``evaluate_decks(decks, n_games=None,
+    game_offset=0)``, with the arguments forwarded to ``EvalWorker.evaluate``.
+
+    backend="local" evaluates in this process; backend="process" uses a
+    pool of ``n_workers`` local processes, each holding its own model and
+    engines; backend="ray" spreads the decks over ``n_workers`` Ray actors
+    (on a Ray cluster if one is configured via ``RAY_ADDRESS``). Selection and variation always stay in
+    the driver process. ``device`` is passed to ``MaskablePPO.load``
+    ("auto" picks CUDA when available, with fp16 autocast); ``quantize``
+    runs the policy with qint8 Linear layers, so "auto" resolves to the CPU.
+    """
+    if quantize:
+        if device not in ("auto", "cpu"):
+            raise ValueError(f"quantize=True runs on the CPU only, got device={device!r}")
+        device = "cpu"
+
+    if backend == "local":
+        worker = EvalWorker(cards_json, model_path, n_games_per_matchup, quantize, device)
+        return lambda decks, n_games=None, game_offset=0: [
+            worker.evaluate(d, n_games, game_offset) for d in decks
+        ]
+
+    if backend == "process":
+        # Forked workers inherit the driver's already-parsed meta decks
+        # (_load_meta cache); the model and engines are still built per worker
+        start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+        executor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_worker_init,
+            initargs=(cards_json, model_path, n_games_per_matchup, quantize, device),
+        )
+
+        def evaluate_decks(decks, n_games=None, game_offset=0):
+            chunksize = max(1, len(decks) // (4 * n_workers))
+            return list(executor.map(
+                _eval_worker, decks, repeat(n_games), repeat(game_offset), chunksize=chunksize,
+            ))
+
+        return evaluate_decks
+
+    if backend == "ray":
+        try:
+            import ray
+            from ray.util import ActorPool
+        except ImportError:
+            raise ImportError("backend='ray' requires ray: pip install ray")
+
+        ray.init(ignore_reinit_error=True)
+        # Workers share the GPUs evenly when evaluating on CUDA
+        num_gpus = 0 if device == "cpu" else ray.cluster_resources().get("GPU", 0) / n_workers
+        actor_cls = ray.remote(num_cpus=1, num_gpus=num_gpus)(EvalWorker)
+        pool = ActorPool([
+            actor_cls.remote(cards_json, model_path, n_games_per_matchup, quantize, device)
+            for _ in range(n_workers)
+        ])
+        return lambda decks, n_games=None, game_offset=0: list(pool.map(
+            lambda a, d: a.evaluate.remote(d, n_games, game_offset), decks,
+        ))
+
+    raise ValueError(f"Unknown evaluation backend: {backend}")
+
+
 def tournament_select(population, rng, k=3):
-    contestants = rng.sample(population, min(k, len(population)))
-    return max(contestants, key=lambda c: c.fitness)
+    """Return the fittest of k contestants drawn with replacement."""
+    contestants = rng.integers(0, len(population), size=k)
+    return max((population[i] for i in contestants), key=lambda c: c.fitness)
 
 
 # ---------------------------------------------------------------------------
@@ -334,48 +697,43 @@ def optimize_counter_deck(
     population_size=50,
     generations=30,
     n_games_per_matchup=10,
+    n_screen_games=3,
+    promote_ratio=0.25,
     mutation_rate=0.30,
     crossover_rate=0.40,
     elite_ratio=0.10,
+    backend="local",
+    n_workers=1,
+    quantize=False,
+    device="auto",
 ):
-    import torch
-    from sb3_contrib import MaskablePPO
-    from tcg_pocket_engine import PyGameEngine
-
-    torch.distributions.Distribution.set_default_validate_args(False)
-
     with open(cards_json) as f:
         cards = json.load(f)
 
     slug_to_card = {c["slug"]: c for c in cards}
+    slugs, slug_to_id, name_of, n_names = build_card_index(cards)
+    name_counts = np.zeros(n_names, dtype=np.int8)
 
     # Load meta decks
-    sys.path.insert(0, str(Path(__file__).parent))
-    from train_meta import resolve_decks, META_DECKS_BY_NAME
-    meta_decks_dict = resolve_decks(cards_json)
-    meta_names = list(meta_decks_dict.keys())
-    meta_deck_lists = list(meta_decks_dict.values())
-
-    # Determine energy type for each meta deck
-    meta_energy = {}
-    for name, info in META_DECKS_BY_NAME.items():
-        meta_energy[name] = info["energy"]
+    meta_names, meta_deck_lists, meta_energy = _load_meta(cards_json)
 
     print(f"Loaded {len(meta_deck_lists)} meta decks as opponents")
 
-    # Load model
-    print(f"Loading model from {model_path}...")
-    model = MaskablePPO.load(model_path)
-    engine = PyGameEngine(cards_json)
+    # Load model into the evaluation worker(s)
+    print(f"Loading model from {model_path} ({backend} evaluation)...")
+    evaluate_decks = make_evaluator(
+        cards_json, model_path, n_games_per_matchup,
+        backend=backend, n_workers=n_workers, quantize=quantize, device=device,
+    )
 
-    rng = random.Random(42)
+    rng = np.random.default_rng(42)
     n_elite = max(1, int(population_size * elite_ratio))
 
     # Build per-energy-type card pools
     energy_pools = {}
     for etype in ENERGY_TYPES:
         basics, evo_chains, trainers, _ = build_card_pool(cards, etype)
-        energy_pools[etype] = (basics, evo_chains, trainers)
+        energy_pools[etype] = build_pool_arrays(basics, evo_chains, trainers, slug_to_id)
         n_evo = sum(len(chains) for chains in evo_chains.values())
         print(f"  {etype:10s}: {len(basics):3d} basics, {n_evo:3d} evo lines, {len(trainers)} trainers")
 
@@ -383,52 +741,110 @@ def optimize_counter_deck(
     population = []
     for name, deck in zip(meta_names, meta_deck_lists):
         etype = meta_energy.get(name, "water")
-        population.append(DeckCandidate(card_ids=list(deck), energy_type=etype))
+        deck_ids = np.array([slug_to_id[slug] for slug in deck], dtype=np.int32)
+        population.append(DeckCandidate(card_ids=deck_ids, energy_type=etype))
 
     while len(population) < population_size:
-        etype = rng.choice(ENERGY_TYPES)
-        basics, evo_chains, trainers = energy_pools[etype]
-        if not basics:
+        etype = rng_choice(ENERGY_TYPES, rng)
+        pool = energy_pools[etype]
+        if not len(pool.basic_ids):
             continue
-        deck = build_random_evo_deck(basics, evo_chains, trainers, slug_to_card, rng)
+        deck = build_random_evo_deck(pool, name_of, name_counts, rng)
         population.append(DeckCandidate(card_ids=deck, energy_type=etype))
 
+    n_meta = len(meta_deck_lists)
+    n_screen_games = min(n_screen_games, n_games_per_matchup) or n_games_per_matchup
+    n_promote = max(1, int(population_size * promote_ratio))
+    n_promote_window = min(population_size, 2 * n_promote)
+    games_per_deck = n_games_per_matchup * n_meta
+
     print(f"\nPopulation: {population_size} | Generations: {generations}")
     print(f"Games per matchup: {n_games_per_matchup} "
-          f"(× {len(meta_deck_lists)} = {n_games_per_matchup * len(meta_deck_lists)} games/deck)\n")
+          f"(× {n_meta} = {games_per_deck} games/deck)")
+    print(f"Screening: {n_screen_games} games per matchup, "
+          f"top {n_promote} completed to the full budget\n")
 
     start_time = time.time()
     best_ever = None
 
+    # fingerprint -> (fitness, matchup_wins, games_played) for every deck
+    # evaluated so far, so decks that reappear in later generations are not
+    # replayed (screened-only entries can still be completed later)
+    fitness_cache = {}
+
+    def run_evaluations(candidates, n_games, game_offset):
+        """Play ``n_games`` more per matchup and fold them into each candidate."""
+        decks = [[slugs[i] for i in c.card_ids] for c in candidates]
+        results = evaluate_decks(decks, n_games, game_offset)
+        for candidate, result in zip(candidates, results):
+            if result is None:
+                # The engine rejected the deck: score it 0, also over an
+                # earlier screening result, and mark it fully evaluated so
+                # stage 2 never retries it
+                candidate.fitness = 0.0
+                candidate.games_played = games_per_deck
+            else:
+                fitness, matchup_wins = result
+                prior = candidate.games_played
+                played = n_games * n_meta
+                candidate.fitness = (candidate.fitness * prior + fitness * played) / (prior + played)
+                candidate.matchup_wins = {
+                    name: candidate.matchup_wins.get(name, 0) + wins
+                    for name, wins in matchup_wins.items()
+                }
+                candidate.games_played = prior + played
+            fitness_cache[candidate.fingerprint] = (
+                candidate.fitness, candidate.matchup_wins, candidate.games_played,
+            )
+
     for gen in range(generations):
+        unevaluated = []
         for candidate in population:
-            if candidate.games_played == 0:
-                try:
-                    fitness, matchup_wins = evaluate_deck_vs_meta(
-                        candidate.card_ids, meta_deck_lists, meta_names,
-                        engine, model, n_games_per_matchup,
-                    )
-                    candidate.fitness = fitness
-                    candidate.matchup_wins = matchup_wins
-                    candidate.games_played = n_games_per_matchup * len(meta_deck_lists)
-                except Exception as e:
-                    candidate.fitness = 0.0
-                    candidate.games_played = 1
-
-        population.sort(key=lambda c: c.fitness, reverse=True)
+            if candidate.games_played > 0:
+                continue
+            cached = fitness_cache.get(candidate.fingerprint)
+            if cached is None:
+                unevaluated.append(candidate)
+                continue
+            candidate.fitness = cached[0]
+            candidate.matchup_wins = dict(cached[1])
+            candidate.games_played = cached[2]
+
+        # Stage 1: screen every new deck with a few games per matchup
+        run_evaluations(unevaluated, n_screen_games, 0)
+
+        # Stage 2: complete the top decks to the full budget, continuing the
+        # same seed sequence; repeat until the top n_promote are all complete.
+        # Decks just below the cut are completed in the same call, since they
+        # tend to move up as the leaders' full results come in
+        while True:
+            fitness_arr = np.fromiter((c.fitness for c in population),
+                                      dtype=np.float64, count=len(population))
+            order = np.argsort(-fitness_arr, kind="stable")
+            population = [population[i] for i in order]
+            fitness_arr = fitness_arr[order]
+            partial = [0 < c.games_played // n_meta < n_games_per_matchup
+                       for c in population[:n_promote_window]]
+            if not any(partial[:n_promote]):
+                break
+            screened = [c for c, p in zip(population, partial) if p]
+            done = screened[0].games_played // n_meta
+            batch = [c for c in screened if c.games_played // n_meta == done]
+            run_evaluations(batch, n_games_per_matchup - done, done)
 
         best = population[0]
-        avg = np.mean([c.fitness for c in population])
+        avg = float(fitness_arr.mean())
         worst_mu = min(best.matchup_wins.values()) if best.matchup_wins else 0
         elapsed = time.time() - start_time
 
         if best_ever is None or best.fitness > best_ever.fitness:
             best_ever = DeckCandidate(
-                card_ids=list(best.card_ids),
+                card_ids=best.card_ids.copy(),
                 energy_type=best.energy_type,
                 fitness=best.fitness,
                 matchup_wins=dict(best.matchup_wins),
                 games_played=best.games_played,
+                fingerprint=best.fingerprint,
             )
 
         print(
@@ -447,6 +863,10 @@ def optimize_counter_deck(
         for i in range(n_elite):
             new_population.append(population[i])
 
+        # Fingerprints of this generation's decks and queued children, so the
+        # next generation holds no duplicates (older decks hit fitness_cache)
+        seen = {c.fingerprint for c in population}
+
         while len(new_population) < population_size:
             r = rng.random()
             if r < crossover_rate:
@@ -454,30 +874,36 @@ def optimize_counter_deck(
                 p2 = tournament_select(population, rng)
                 # Crossover only between same energy type
                 if p1.energy_type == p2.energy_type:
-                    child = crossover_decks(p1.card_ids, p2.card_ids, slug_to_card, rng)
-                    new_population.append(DeckCandidate(card_ids=child, energy_type=p1.energy_type))
+                    etype = p1.energy_type
+                    child = crossover_decks(p1.card_ids, p2.card_ids, name_of, name_counts, rng)
                 else:
                     # Pick the better parent's type, mutate it
                     parent = p1 if p1.fitness > p2.fitness else p2
                     etype = parent.energy_type
-                    basics, evo_chains, trainers = energy_pools[etype]
-                    child = mutate_deck(parent.card_ids, basics, evo_chains, trainers, slug_to_card, rng)
-                    new_population.append(DeckCandidate(card_ids=child, energy_type=etype))
+                    child = mutate_deck(parent.card_ids, energy_pools[etype], name_of, name_counts, rng)
 
             elif r < crossover_rate + mutation_rate:
                 parent = tournament_select(population, rng)
                 etype = parent.energy_type
-                basics, evo_chains, trainers = energy_pools[etype]
-                child = mutate_deck(parent.card_ids, basics, evo_chains, trainers, slug_to_card, rng)
-                new_population.append(DeckCandidate(card_ids=child, energy_type=etype))
+                child = mutate_deck(parent.card_ids, energy_pools[etype], name_of, name_counts, rng)
 
             else:
-                etype = rng.choice(ENERGY_TYPES)
-                basics, evo_chains, trainers = energy_pools[etype]
-                if not basics:
+                etype = rng_choice(ENERGY_TYPES, rng)
+                pool = energy_pools[etype]
+                if not len(pool.basic_ids):
                     continue
-                deck = build_random_evo_deck(basics, evo_chains, trainers, slug_to_card, rng)
-                new_population.append(DeckCandidate(card_ids=deck, energy_type=etype))
+                child = build_random_evo_deck(pool, name_of, name_counts, rng)
+
+            fp = tuple(np.sort(child).tolist())
+            if fp in seen:
+                # Duplicate: give it one extra mutation, else draw again
+                child = mutate_deck(child, energy_pools[etype], name_of, name_counts, rng)
+                fp = tuple(np.sort(child).tolist())
+                if fp in seen:
+                    continue
+
+            seen.add(fp)
+            new_population.append(DeckCandidate(card_ids=child, energy_type=etype, fingerprint=fp))
 
         population = new_population
 
@@ -487,15 +913,16 @@ def optimize_counter_deck(
     print("=" * 60)
     print(f"Overall win rate: {best_ever.fitness:.1%}\n")
 
+    best_slugs = [slugs[i] for i in best_ever.card_ids]
     card_counts = {}
-    for slug in best_ever.card_ids:
+    for slug in best_slugs:
         card = slug_to_card.get(slug)
         name = card["name"] if card else slug
         card_counts[name] = card_counts.get(name, 0) + 1
 
     pokemon_cards = []
     trainer_cards = []
-    for slug in best_ever.card_ids:
+    for slug in best_slugs:
         card = slug_to_card.get(slug)
         if card:
             if card.get("card_type") == "pokemon":
@@ -544,7 +971,7 @@ def optimize_counter_deck(
         bar = "#" * wins + "." * (n_games_per_matchup - wins)
         print(f"  vs {meta_name:25s}: {wins:2d}/{n_games_per_matchup} ({pct:5.1f}%) [{bar}]")
 
-    print(f"\nDeck IDs: {best_ever.card_ids}")
+    print(f"\nDeck IDs: {best_slugs}")
     return best_ever
 
 
@@ -555,10 +982,14 @@ if __name__ == "__main__":
     model_path = sys.argv[1] if len(sys.argv) > 1 else "checkpoints/ppo_meta_final"
     generations = int(sys.argv[2]) if len(sys.argv) > 2 else 30
     pop_size = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    backend = sys.argv[4] if len(sys.argv) > 4 else "local"  # local | process | ray
+    n_workers = int(sys.argv[5]) if len(sys.argv) > 5 else 1
 
     optimize_counter_deck(
         cards_json,
         model_path=model_path,
         generations=generations,
         population_size=pop_size,
+        backend=backend,
+        n_workers=n_workers,
     )
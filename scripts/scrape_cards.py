@@ -14,36 +14,79 @@ import time
 
 from playwright.async_api import async_playwright
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
 BASE_URL = "https://pocket.pokemongohub.net"
-
-
-def parse_card_from_rsc(rsc_text: str, card_url: str) -> dict:
-    """Parse card data from Next.js RSC flight payload."""
-    card = {"url": card_url, "slug": card_url.split("/")[-1]}
+# Card RSC payloads fetched at once
+FETCH_CONCURRENCY = 8
+
+# RSC payload patterns, compiled once for the whole scrape
+_NAME_PAREN_RE = re.compile(r"(.+?)\s*\(")
+_EVOLVES_RE = re.compile(r"evolves from (\w[\w\s\-']*?)[\.\,]", re.IGNORECASE)
+_ATTACK_NAME_RE = re.compile(
+    r'"h3",null,\{"className":"text-lg font-bold","children":"([^"]+)"\}'
+)
+_DAMAGE_RE = re.compile(r'"font-bold","children":\[(\d+),')
+_EFFECT_RE = re.compile(r'"text-sm pt-1","children":"([^"]*)"')
+_COST_RE = re.compile(r'"cost-(\w+)-(\d+)"')
+_ABILITY_RE = re.compile(
+    r'"Ability".*?"text-lg font-bold","children":"([^"]+)".*?"text-sm[^"]*","children":"([^"]+)"',
+    re.DOTALL,
+)
+_TRAINER_EFFECT_RE = re.compile(r'"Description".*?"children":"([^"]{5,})"')
+_SCHEMA_PREFIX = '{"@context":"https://schema.org","@type":["Product","CreativeWork"]'
+_DECODER = json.JSONDecoder()
+# Card type markers; the closing quote is a lookahead so adjacent markers
+# can share it
+_TYPE_RE = re.compile(r'"(Supporter|supporter|Item|Tool|Fossil)(?=")|Pok\u00e9mon Tool')
+
+
+def _load_json(path):
+    """Read a JSON file, with orjson when it is installed."""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path) as f:
+        return json.load(f)
+
+
+def _dump_json(obj, path):
+    """Write ``obj`` as indented JSON, with orjson when it is installed."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, "w") as f:
+        json.dump(obj, f, indent=2)
+
+
+def parse_card_from_rsc(rsc_text: str, card_url: str, slug: str | None = None) -> dict:
+    """Parse card data from Next.js RSC flight payload.
+
+    ``slug`` defaults to the last path segment of ``card_url``.
+    """
+    if slug is None:
+        slug = card_url.rsplit("/", 1)[-1]
+    card = {"url": card_url, "slug": slug}
 
     # --- Extract schema.org JSON-LD Product data ---
-    # The JSON has nested objects, so we can't use .*? - find start and parse with brace counting
-    schema_start = rsc_text.find('{"@context":"https://schema.org","@type":["Product","CreativeWork"]')
+    # The JSON has nested objects, so we can't use .*? - find the start and
+    # let the decoder consume exactly one object from there
+    schema_start = rsc_text.find(_SCHEMA_PREFIX)
     schema = None
     if schema_start >= 0:
-        # Find the matching closing brace
-        depth = 0
-        for i in range(schema_start, min(schema_start + 5000, len(rsc_text))):
-            if rsc_text[i] == '{':
-                depth += 1
-            elif rsc_text[i] == '}':
-                depth -= 1
-                if depth == 0:
-                    try:
-                        schema = json.loads(rsc_text[schema_start:i+1])
-                    except json.JSONDecodeError:
-                        pass
-                    break
+        try:
+            schema, _ = _DECODER.raw_decode(rsc_text, schema_start)
+        except json.JSONDecodeError:
+            pass
     if schema:
         try:
             name = schema.get("name", "")
-            name_match = re.match(r"(.+?)\s*\(", name)
+            name_match = _NAME_PAREN_RE.match(name)
             card["name"] = name_match.group(1).strip() if name_match else name
 
             for prop in schema.get("additionalProperty", []):
@@ -70,15 +113,15 @@ def parse_card_from_rsc(rsc_text: str, card_url: str) -> dict:
             pass
 
     # --- Determine card type ---
-    card_type = "pokemon"
-    if '"Supporter"' in rsc_text[:5000] or '"supporter"' in rsc_text[:5000]:
+    # One scan of the first 10000 characters, recording where each marker
+    # first ends; "Supporter" only counts within the first 5000
+    found = {}
+    for m in _TYPE_RE.finditer(rsc_text, 0, 10000):
+        found.setdefault((m.group(1) or "tool").lower(), m.end())
+    if found.get("supporter", 5000) < 5000:
         card_type = "supporter"
-    elif '"Item"' in rsc_text[:10000]:
-        card_type = "item"
-    elif "Pokémon Tool" in rsc_text[:10000] or '"Tool"' in rsc_text[:10000]:
-        card_type = "tool"
-    elif '"Fossil"' in rsc_text[:10000]:
-        card_type = "fossil"
+    else:
+        card_type = next((t for t in ("item", "tool", "fossil") if t in found), "pokemon")
     card["card_type"] = card_type
 
     # --- Extract attacks (Pokemon only) ---
@@ -86,9 +129,7 @@ def parse_card_from_rsc(rsc_text: str, card_url: str) -> dict:
         card["attacks"] = parse_attacks_from_rsc(rsc_text)
         card["ability"] = parse_ability_from_rsc(rsc_text)
         card["is_ex"] = " ex" in card.get("name", "")
-        evolves_match = re.search(
-            r"evolves from (\w[\w\s\-']*?)[\.\,]", rsc_text, re.IGNORECASE
-        )
+        evolves_match = _EVOLVES_RE.search(rsc_text)
         card["evolves_from"] = evolves_match.group(1).strip() if evolves_match else None
     else:
         card["effect"] = parse_trainer_effect(rsc_text)
@@ -99,32 +140,27 @@ def parse_card_from_rsc(rsc_text: str, card_url: str) -> dict:
 def parse_attacks_from_rsc(rsc_text: str) -> list:
     """Extract attacks using the cost-{type}-{index} pattern in RSC payload."""
     attacks = []
-    name_pattern = re.compile(
-        r'"h3",null,\{"className":"text-lg font-bold","children":"([^"]+)"\}'
-    )
-    damage_pattern = re.compile(r'"font-bold","children":\[(\d+),')
-    effect_pattern = re.compile(r'"text-sm pt-1","children":"([^"]*)"')
-    cost_pattern = re.compile(r'"cost-(\w+)-(\d+)"')
-
     skip_names = {"From a Regular Pack", "From a Rare Pack", "Set", "From a Wonder Pick"}
 
-    for name_match in name_pattern.finditer(rsc_text):
+    for name_match in _ATTACK_NAME_RE.finditer(rsc_text):
         attack_name = name_match.group(1)
         if attack_name in skip_names:
             continue
 
         attack = {"name": attack_name, "energy_cost": [], "damage": 0, "effect": None}
 
-        before = rsc_text[max(0, name_match.start() - 800) : name_match.start()]
-        costs = cost_pattern.findall(before)
-        attack["energy_cost"] = [c[0] for c in costs]
+        # Costs come in the 800 chars before the name, damage and effect in
+        # the 300 after; scan those windows in place rather than slicing
+        start, end = name_match.span()
+        attack["energy_cost"] = [
+            m.group(1) for m in _COST_RE.finditer(rsc_text, max(0, start - 800), start)
+        ]
 
-        after = rsc_text[name_match.end() : name_match.end() + 300]
-        dm = damage_pattern.search(after)
+        dm = _DAMAGE_RE.search(rsc_text, end, end + 300)
         if dm:
             attack["damage"] = int(dm.group(1))
 
-        em = effect_pattern.search(after)
+        em = _EFFECT_RE.search(rsc_text, end, end + 300)
         if em and em.group(1):
             attack["effect"] = em.group(1)
 
@@ -135,34 +171,54 @@ def parse_attacks_from_rsc(rsc_text: str) -> list:
 
 def parse_ability_from_rsc(rsc_text: str) -> dict | None:
     """Extract ability from RSC payload."""
-    m = re.search(
-        r'"Ability".*?"text-lg font-bold","children":"([^"]+)".*?"text-sm[^"]*","children":"([^"]+)"',
-        rsc_text[:30000],
-        re.DOTALL,
-    )
+    m = _ABILITY_RE.search(rsc_text, 0, 30000)
     if m:
         return {"name": m.group(1), "description": m.group(2)}
     return None
 
 
 def parse_trainer_effect(rsc_text: str) -> str | None:
-    match = re.search(r'"Description".*?"children":"([^"]{5,})"', rsc_text[:20000])
+    match = _TRAINER_EFFECT_RE.search(rsc_text, 0, 20000)
     return match.group(1) if match else None
 
 
 async def scrape_all_cards():
     os.makedirs(DATA_DIR, exist_ok=True)
 
-    # Check for existing progress
+    # Check for existing progress. Cards are appended to a JSONL log as they
+    # are scraped; the indented cards_scraped.json is written once at the end.
     urls_path = os.path.join(DATA_DIR, "card_urls.json")
-    progress_path = os.path.join(DATA_DIR, "cards_scraped.json")
+    progress_path = os.path.join(DATA_DIR, "cards_scraped.jsonl")
+    output_path = os.path.join(DATA_DIR, "cards_scraped.json")
 
     existing_cards = []
     existing_slugs = set()
+    lines = []
     if os.path.exists(progress_path):
         with open(progress_path) as f:
-            existing_cards = json.load(f)
-            existing_slugs = {c["slug"] for c in existing_cards}
+            lines = [line for line in f if line.strip()]
+    if lines:
+        existing_cards = [json.loads(line) for line in lines[:-1]]
+        try:
+            existing_cards.append(json.loads(lines[-1]))
+        except json.JSONDecodeError:
+            # A killed scrape can leave the last line half-written; drop it
+            # so new cards are not appended onto it
+            print(f"Warning: dropping truncated last line of {progress_path}", flush=True)
+            with open(progress_path, "w") as f:
+                f.writelines(lines[:-1])
+        else:
+            if not lines[-1].endswith("\n"):
+                with open(progress_path, "a") as f:
+                    f.write("\n")
+    if not existing_cards and os.path.exists(output_path):
+        # Output of an earlier run without a (non-empty) log: seed the log
+        # from it
+        existing_cards = _load_json(output_path)
+        with open(progress_path, "w") as f:
+            f.writelines(json.dumps(c) + "\n" for c in existing_cards)
+    if existing_cards:
+        existing_slugs = {c["slug"] for c in existing_cards}
         print(f"Resuming: {len(existing_cards)} cards already scraped", flush=True)
 
     async with async_playwright() as p:
@@ -187,8 +243,7 @@ async def scrape_all_cards():
         # Get card URLs (from cache or fresh)
         unique_urls = []
         if os.path.exists(urls_path):
-            with open(urls_path) as f:
-                unique_urls = json.load(f)
+            unique_urls = _load_json(urls_path)
             print(f"Loaded {len(unique_urls)} card URLs from cache", flush=True)
         else:
             set_links = await page.eval_on_selector_all(
@@ -210,38 +265,61 @@ async def scrape_all_cards():
                 print(f"{len(card_links)} cards", flush=True)
                 all_card_urls.extend(card_links)
 
-            seen = set()
-            for url in all_card_urls:
-                if url not in seen:
-                    seen.add(url)
-                    unique_urls.append(url)
+            # Order-preserving dedup
+            unique_urls = list(dict.fromkeys(all_card_urls))
 
-            with open(urls_path, "w") as f:
-                json.dump(unique_urls, f, indent=2)
+            _dump_json(unique_urls, urls_path)
             print(f"Saved {len(unique_urls)} unique card URLs", flush=True)
 
         # Filter already scraped
-        to_scrape = [u for u in unique_urls if u.split("/")[-1] not in existing_slugs]
+        # (url, slug) pairs, splitting each URL once
+        to_scrape = [(u, slug) for u in unique_urls
+                     if (slug := u.rsplit("/", 1)[-1]) not in existing_slugs]
         print(f"\nCards to scrape: {len(to_scrape)} (skipping {len(existing_slugs)})", flush=True)
 
-        all_cards = list(existing_cards)
+        # existing_cards is not used again; extend it rather than copying it
+        all_cards = existing_cards
         failed = []
         start_time = time.time()
-
-        for i, card_url in enumerate(to_scrape):
-            slug = card_url.split("/")[-1]
-            try:
-                rsc = await page.evaluate(
-                    """async (url) => {
-                        const resp = await fetch(url, {
-                            headers: { 'RSC': '1', 'Next-Url': url }
-                        });
-                        return await resp.text();
-                    }""",
-                    card_url,
-                )
-                card = parse_card_from_rsc(rsc, card_url)
+        n_done = 0
+        sem = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+        async def fetch_one(card_url, slug):
+            nonlocal n_done
+            async with sem:
+                try:
+                    # APIRequestContext shares the context's cookies (incl.
+                    # the Cloudflare clearance) without a round trip through
+                    # the page's JS
+                    resp = await context.request.fetch(
+                        f"{BASE_URL}{card_url}",
+                        headers={"RSC": "1", "Next-Url": card_url},
+                    )
+                    if resp.status == 403:
+                        # Challenged outside the page; retry from inside it
+                        rsc = await page.evaluate(
+                            """async (url) => {
+                                const resp = await fetch(url, {
+                                    headers: { 'RSC': '1', 'Next-Url': url }
+                                });
+                                if (!resp.ok) throw new Error('HTTP ' + resp.status);
+                                return await resp.text();
+                            }""",
+                            card_url,
+                        )
+                    elif not resp.ok:
+                        raise RuntimeError(f"HTTP {resp.status}")
+                    else:
+                        rsc = await resp.text()
+                    card = parse_card_from_rsc(rsc, card_url, slug)
+                except Exception as e:
+                    card = None
+                    error = e
+
+            n_done += 1
+            if card is not None:
                 all_cards.append(card)
+                progress_fp.write(json.dumps(card) + "\n")
 
                 # Print progress for every card
                 attacks_str = ""
@@ -251,40 +329,41 @@ async def scrape_all_cards():
                         for a in card["attacks"]
                     )
                 print(
-                    f"  [{i+1}/{len(to_scrape)}] {card.get('name', '?')} "
+                    f"  [{n_done}/{len(to_scrape)}] {card.get('name', '?')} "
                     f"({card.get('card_type', '?')}, {card.get('hp', '-')}HP)"
                     f"{attacks_str}",
                     flush=True,
                 )
-
-            except Exception as e:
-                print(f"  [{i+1}/{len(to_scrape)}] FAILED {slug}: {e}", flush=True)
+            else:
+                print(f"  [{n_done}/{len(to_scrape)}] FAILED {slug}: {error}", flush=True)
                 failed.append(card_url)
 
-            # Save progress every 50 cards
-            if (i + 1) % 50 == 0:
-                with open(progress_path, "w") as f:
-                    json.dump(all_cards, f, indent=2)
+            # Flush progress every 50 cards
+            if n_done % 50 == 0:
+                progress_fp.flush()
                 elapsed = time.time() - start_time
-                rate = (i + 1) / elapsed
-                remaining = (len(to_scrape) - i - 1) / rate if rate > 0 else 0
+                rate = n_done / elapsed
+                remaining = (len(to_scrape) - n_done) / rate if rate > 0 else 0
                 print(
                     f"  --- Saved progress: {len(all_cards)} total, "
                     f"{elapsed:.0f}s elapsed, ~{remaining:.0f}s remaining ---",
                     flush=True,
                 )
 
+        # Up to FETCH_CONCURRENCY fetches in flight; cards are recorded in
+        # completion order
+        with open(progress_path, "a") as progress_fp:
+            await asyncio.gather(*(fetch_one(u, slug) for u, slug in to_scrape))
+
         # Final save
-        with open(progress_path, "w") as f:
-            json.dump(all_cards, f, indent=2)
+        _dump_json(all_cards, output_path)
 
         elapsed = time.time() - start_time
         print(f"\nDone! {len(all_cards)} cards in {elapsed:.1f}s", flush=True)
 
         if failed:
             print(f"Failed: {len(failed)}", flush=True)
-            with open(os.path.join(DATA_DIR, "cards_failed.json"), "w") as f:
-                json.dump(failed, f, indent=2)
+            _dump_json(failed, os.path.join(DATA_DIR, "cards_failed.json"))
 
         # Stats
         pokemon = sum(1 for c in all_cards if c.get("card_type") == "pokemon")
@@ -298,4 +377,11 @@ async def scrape_all_cards():
 
 
 if __name__ == "__main__":
+    # uvloop's event loop when installed; the scrape is all network I/O
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        uvloop.install()
     asyncio.run(scrape_all_cards())
@@ -10,7 +10,9 @@ February 2026 meta.
 """
 
 import json
+import multiprocessing
 import os
+import pickle
 import random
 import sys
 import time
@@ -18,6 +20,11 @@ from pathlib import Path
 
 import numpy as np
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ============================================================================
 # META DECKLISTS (20 cards each)
 # Card IDs are slugs from the scraped database.
@@ -240,17 +247,52 @@ META_DECKS_BY_NAME = {
 }
 
 
-def resolve_decks(cards_json: str) -> dict[str, list[str]]:
-    """Resolve card names to IDs from the database."""
-    with open(cards_json) as f:
-        cards = json.load(f)
+# Every card name used by a meta deck
+_ALL_META_NAMES = frozenset(
+    name for deck in META_DECKS_BY_NAME.values() for name, _ in deck["cards"]
+)
+
+
+def load_name_to_slug(cards_json: str) -> dict[str, str]:
+    """Map the card names used by META_DECKS_BY_NAME to their first slug.
 
-    # Build name -> first slug mapping
+    The mapping is pickled next to ``cards_json`` and reused until the JSON
+    file or the set of meta card names changes.
+    """
+    cache_path = f"{cards_json}.name_to_slug.pkl"
+    try:
+        if os.path.getmtime(cache_path) >= os.path.getmtime(cards_json):
+            with open(cache_path, "rb") as f:
+                names, name_to_slug = pickle.load(f)
+            if names == _ALL_META_NAMES:
+                return name_to_slug
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        pass
+
+    if orjson is not None:
+        with open(cards_json, "rb") as f:
+            cards = orjson.loads(f.read())
+    else:
+        with open(cards_json) as f:
+            cards = json.load(f)
+
+    # Build name -> first slug mapping, for meta deck cards only
     name_to_slug = {}
     for c in cards:
-        name = c["name"]
-        if name not in name_to_slug:
-            name_to_slug[name] = c["slug"]
+        if c["name"] in _ALL_META_NAMES:
+            name_to_slug.setdefault(c["name"], c["slug"])
+
+    try:
+        with open(cache_path, "wb") as f:
+            pickle.dump((_ALL_META_NAMES, name_to_slug), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+    return name_to_slug
+
+
+def resolve_decks(cards_json: str) -> dict[str, list[str]]:
+    """Resolve card names to IDs from the database."""
+    name_to_slug = load_name_to_slug(cards_json)
 
     resolved = {}
     for deck_name, deck_info in META_DECKS_BY_NAME.items():
@@ -281,16 +323,24 @@ def train_meta(
     log_dir: str = "logs",
     n_envs: int = 8,
     resume_from: str | None = None,
+    bf16: bool = False,
+    compile_policy: bool = False,
 ):
     """Train RL agent using meta deck matchups.
 
     Instead of random decks, uses actual meta decks for both the agent
     and opponent, cycling through all matchup combinations.
+
+    ``bf16`` collects rollouts with the MLP under bfloat16 autocast
+    (BF16MaskablePolicy; weights and the PPO update stay fp32).
+    ``compile_policy`` compiles the MLP extractor in place with
+    ``torch.compile`` (``nn.Module.compile``, torch>=2.2).
     """
     import torch
     from sb3_contrib import MaskablePPO
     from stable_baselines3.common.vec_env import SubprocVecEnv
     from tcg_pocket_rl.env import PokemonTCGPocketEnv
+    from tcg_pocket_rl.policies import BF16MaskablePolicy
 
     # Disable strict distribution validation — MaskablePPO's softmax
     # occasionally fails the Simplex tolerance check due to float32 precision.
@@ -311,7 +361,7 @@ def train_meta(
 
     rng = random.Random(42)
 
-    # Pick initial matchup
+    # Decks the envs start with; the schedule below switches them in place
     agent_deck = deck_lists[0]
     opp_deck = deck_lists[1]
 
@@ -342,7 +392,6 @@ def train_meta(
     steps_per_iter = n_envs * 2048
     n_iterations = max(1, total_timesteps // steps_per_iter)
     steps_done = 0
-    matchup_idx = 0
 
     # Generate all matchup pairs
     matchups = []
@@ -352,19 +401,23 @@ def train_meta(
                 matchups.append((i, j))
     rng.shuffle(matchups)
 
+    # Each matchup trains for 3 consecutive iterations; a resumed run finds
+    # its matchup from the iteration number alone
+    schedule = [matchups[(it // 3) % len(matchups)] for it in range(n_iterations)]
+
     if resume_from:
         print(f"Resuming from checkpoint: {resume_from}")
-        model = MaskablePPO.load(resume_from, env=env)
+        custom_objects = {"policy_class": BF16MaskablePolicy} if bf16 else None
+        model = MaskablePPO.load(resume_from, env=env, custom_objects=custom_objects)
         # Parse steps done from checkpoint filename (e.g., ppo_meta_655360)
         try:
             steps_done = int(Path(resume_from).stem.split("_")[-1])
         except (ValueError, IndexError):
             steps_done = 0
-        matchup_idx = (steps_done // (steps_per_iter * 3)) % len(matchups)
-        print(f"  Resuming from step {steps_done}, matchup index {matchup_idx}")
+        print(f"  Resuming from step {steps_done}, iteration {steps_done // steps_per_iter}")
     else:
         model = MaskablePPO(
-            "MlpPolicy",
+            BF16MaskablePolicy if bf16 else "MlpPolicy",
             env,
             policy_kwargs=dict(net_arch=[512, 256, 128]),
             learning_rate=3e-4,
@@ -379,12 +432,17 @@ def train_meta(
             tensorboard_log=log_dir,
         )
 
+    if compile_policy:
+        # In-place compile keeps the state_dict keys, so checkpoints load as usual
+        model.policy.mlp_extractor.compile()
+
     print(f"\nTraining for {total_timesteps} timesteps ({n_iterations} iterations)")
     print(f"Total matchup pairs: {len(matchups)}")
     print(f"Cycling through matchups every 3 iterations\n")
     start_time = time.time()
 
     start_iteration = steps_done // steps_per_iter
+    current_matchup = None
 
     for iteration in range(start_iteration, n_iterations):
         remaining = total_timesteps - steps_done
@@ -392,6 +450,16 @@ def train_meta(
         if learn_steps <= 0:
             break
 
+        i, j = schedule[iteration]
+        if (i, j) != current_matchup:
+            # Reuse the worker processes: switch decks in place, reseed, and
+            # let set_env force a reset so the next rollout uses the new decks
+            env.env_method("set_decks", deck_lists[i], deck_lists[j])
+            env.seed(iteration * 100)
+            model.set_env(env)
+            current_matchup = (i, j)
+            print(f"  [{steps_done}] Matchup: {deck_names[i]} vs {deck_names[j]}")
+
         model.learn(
             total_timesteps=learn_steps,
             reset_num_timesteps=False,
@@ -402,17 +470,6 @@ def train_meta(
         elapsed = time.time() - start_time
         fps = steps_done / elapsed if elapsed > 0 else 0
 
-        # Rotate matchup every 3 iterations
-        if (iteration + 1) % 3 == 0:
-            matchup_idx = (matchup_idx + 1) % len(matchups)
-            i, j = matchups[matchup_idx]
-            agent_deck = deck_lists[i]
-            opp_deck = deck_lists[j]
-            env.close()
-            env = create_envs(agent_deck, opp_deck, base_seed=iteration * 100)
-            model.set_env(env)
-            print(f"  [{steps_done}] Matchup: {deck_names[i]} vs {deck_names[j]}")
-
         if (iteration + 1) % 10 == 0:
             print(f"  Iteration {iteration + 1}/{n_iterations} | "
                   f"{steps_done}/{total_timesteps} steps | "
@@ -435,47 +492,110 @@ def train_meta(
 
     # Evaluate against each meta deck
     print("\n=== META DECK EVALUATION ===")
-    evaluate_meta(cards_json, final_path, meta_decks, deck_names)
+    evaluate_meta(cards_json, final_path, meta_decks, deck_names, n_workers=n_envs)
 
     return model
 
 
-def evaluate_meta(cards_json, model_path, meta_decks, deck_names, n_games=50):
-    """Evaluate trained model on all meta matchups."""
+def _play_deck_vs_meta(policy, envs, deck_lists, i):
+    """Play deck ``i`` against every other deck; return (wins, total).
+
+    The ``len(envs)`` games of a matchup run side by side, with one batched
+    ``policy.act`` call (a BatchPolicy) per step.
+    """
+    n_games = len(envs)
+    obs = np.empty((n_games, *envs[0].observation_space.shape), dtype=np.float32)
+    masks = np.empty((n_games, envs[0].action_space.n), dtype=np.bool_)
+
+    wins = 0
+    total = 0
+    for j in range(len(deck_lists)):
+        if i == j:
+            continue
+        for game, env in enumerate(envs):
+            env.set_decks(deck_lists[i], deck_lists[j], agent_player=game % 2)
+            obs[game], info = env.reset(seed=game + i * 1000 + j * 100)
+            masks[game] = info["action_mask"]
+
+        live = list(range(n_games))
+        while live:
+            n = len(live)
+            policy.obs[:n] = obs[live]
+            policy.masks[:n] = masks[live]
+            actions = policy.act(n)
+            still_live = []
+            for game, action in zip(live, actions):
+                game_obs, reward, done, truncated, info = envs[game].step(int(action))
+                if done:
+                    if reward > 0:
+                        wins += 1
+                    total += 1
+                else:
+                    obs[game] = game_obs
+                    masks[game] = info["action_mask"]
+                    still_live.append(game)
+            live = still_live
+
+    return wins, total
+
+
+_EVAL_WORKER = None
+
+
+def _eval_worker_init(model, cards_json, deck_lists, n_games):
+    import torch
+    from tcg_pocket_rl.env import PokemonTCGPocketEnv
+    from tcg_pocket_rl.inference import BatchPolicy
+
+    global _EVAL_WORKER
+    # One thread per worker, and a fresh global RNG (the env's random
+    # opponent draws from it) instead of the state inherited from the parent
+    torch.set_num_threads(1)
+    np.random.seed()
+    envs = [PokemonTCGPocketEnv(cards_json=cards_json) for _ in range(n_games)]
+    _EVAL_WORKER = (BatchPolicy(model, max_batch=n_games, fp16=False), envs, deck_lists)
+
+
+def _eval_worker(i):
+    return _play_deck_vs_meta(*_EVAL_WORKER, i)
+
+
+def evaluate_meta(cards_json, model_path, meta_decks, deck_names, n_games=50, n_workers=1):
+    """Evaluate trained model on all meta matchups.
+
+    With ``n_workers > 1`` the agent decks are spread over forked worker
+    processes (at most one per deck). The model is then loaded once here on
+    the CPU (CUDA cannot be used in forked children) and its weights moved
+    to shared memory, so workers neither reload nor copy it. Actions are the
+    argmax of the masked actor logits (BatchPolicy), the same choice as
+    ``model.predict(..., deterministic=True)`` without building a
+    distribution.
+    """
     from sb3_contrib import MaskablePPO
     from tcg_pocket_rl.env import PokemonTCGPocketEnv
+    from tcg_pocket_rl.inference import BatchPolicy
 
-    model = MaskablePPO.load(model_path)
+    # Each worker builds its own n_games envs, so start no more workers
+    # than there are agent decks to hand out
+    n_workers = min(n_workers, len(deck_names))
+    use_workers = n_workers > 1 and "fork" in multiprocessing.get_all_start_methods()
+    model = MaskablePPO.load(model_path, device="cpu" if use_workers else "auto")
     deck_lists = list(meta_decks.values())
 
-    results = {}
-    for i, name_i in enumerate(deck_names):
-        wins = 0
-        total = 0
-        for j, name_j in enumerate(deck_names):
-            if i == j:
-                continue
-            for game in range(n_games):
-                player = game % 2
-                env = PokemonTCGPocketEnv(
-                    cards_json=cards_json,
-                    deck1_ids=deck_lists[i],
-                    deck2_ids=deck_lists[j],
-                    agent_player=player,
-                )
-                obs, info = env.reset(seed=game + i * 1000 + j * 100)
-                done = False
-                while not done:
-                    mask = info.get("action_mask")
-                    if mask is not None:
-                        action, _ = model.predict(obs, action_masks=mask, deterministic=True)
-                    else:
-                        action, _ = model.predict(obs, deterministic=True)
-                    obs, reward, done, truncated, info = env.step(int(action))
-                if reward > 0:
-                    wins += 1
-                total += 1
+    if use_workers:
+        model.policy.share_memory()
+        ctx = multiprocessing.get_context("fork")
+        with ctx.Pool(n_workers, initializer=_eval_worker_init,
+                      initargs=(model, cards_json, deck_lists, n_games)) as pool:
+            rows = pool.map(_eval_worker, range(len(deck_names)))
+    else:
+        # One env per game, built once and re-pointed at each matchup
+        envs = [PokemonTCGPocketEnv(cards_json=cards_json) for _ in range(n_games)]
+        policy = BatchPolicy(model, max_batch=n_games, fp16=False)
+        rows = [_play_deck_vs_meta(policy, envs, deck_lists, i) for i in range(len(deck_names))]
 
+    results = {}
+    for name_i, (wins, total) in zip(deck_names, rows):
         win_rate = wins / total if total > 0 else 0
         results[name_i] = win_rate
         print(f"  {name_i}: {win_rate:.1%} win rate ({wins}/{total})")
@@ -495,8 +615,12 @@ if __name__ == "__main__":
         print(f"ERROR: {cards_json} not found")
         sys.exit(1)
 
-    timesteps = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
-    n_envs = int(sys.argv[2]) if len(sys.argv) > 2 else 8
-    resume = sys.argv[3] if len(sys.argv) > 3 else None
+    # Positional: [timesteps] [n_envs] [resume_from]; flags: --bf16 --compile
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    flags = set(sys.argv[1:]) - set(args)
+    timesteps = int(args[0]) if len(args) > 0 else 2_000_000
+    n_envs = int(args[1]) if len(args) > 1 else 8
+    resume = args[2] if len(args) > 2 else None
 
-    train_meta(cards_json, total_timesteps=timesteps, n_envs=n_envs, resume_from=resume)
+    train_meta(cards_json, total_timesteps=timesteps, n_envs=n_envs, resume_from=resume,
+               bf16="--bf16" in flags, compile_policy="--compile" in flags)